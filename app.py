@@ -1,33 +1,66 @@
-from flask import Flask, render_template, request, flash, redirect, url_for
+from flask import Flask, render_template, request, flash
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.model_selection import train_test_split
-import plotly
 import plotly.graph_objects as go
 import json
-import ta
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from plotly.subplots import make_subplots
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key'  # Required for flash messages
 
+def load_dataset(csv_path='stocks.csv', parquet_path='stocks.parquet'):
+    """Load the dataset, caching it as Parquet after the first CSV parse"""
+    if (os.path.exists(parquet_path)
+            and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)):
+        return pd.read_parquet(parquet_path)
+        
+    data = pd.read_csv(csv_path, engine='pyarrow',
+                       dtype={'open': 'float32', 'high': 'float32', 'low': 'float32',
+                              'close': 'float32', 'volume': 'int32', 'Name': 'category'},
+                       parse_dates=['date'])
+    try:
+        # Write to a temporary file first so concurrent workers never read a partial file
+        tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+        data.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)
+    except OSError as e:
+        print(f"Error caching dataset as Parquet: {str(e)}")
+    return data
+
 # Load the dataset
-df = pd.read_csv('stocks.csv')
-df['date'] = pd.to_datetime(df['date'])
-df.set_index('date', inplace=True)
+df = load_dataset()
+# Sort once by ticker and date; the per-ticker period slice relies on date order
+df = df.sort_values(['Name', 'date']).set_index('date')
+
+# Analysis periods offered by the form, parsed once instead of on every request
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+}
 
 def get_stock_data(ticker, period='1y'):
     """Get stock data from local dataset"""
     try:
-        # Filter data for the specific ticker
-        stock_data = df[df['Name'] == ticker].copy()
+        # Look up data for the specific ticker
+        stock_data = by_symbol.get(ticker)
         
-        if stock_data.empty:
+        if stock_data is None:
             raise ValueError(f"No data found for ticker: {ticker}")
+        if period not in PERIOD_OFFSETS:
+            raise ValueError(f"Unsupported period: {period}")
             
-        # Filter for the last year of data
-        stock_data = stock_data.last(period)
+        # Keep only the requested period of data; the index is sorted by date,
+        # so a binary search finds the first row after the cutoff
+        cutoff = stock_data.index[-1] - PERIOD_OFFSETS[period]
+        start = stock_data.index.searchsorted(cutoff, side='right')
+        stock_data = stock_data.iloc[start:]
         
         return stock_data
         
@@ -35,23 +68,55 @@ def get_stock_data(ticker, period='1y'):
         print(f"Error getting data for {ticker}: {str(e)}")
         return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume', 'Name'])
 
+def _smas(values, windows):
+    """Simple moving averages for several windows from one cumulative sum"""
+    csum = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    smas = {}
+    for window in windows:
+        # NaN until a full window is available
+        sma = np.full(len(values), np.nan)
+        if len(values) >= window:
+            sma[window - 1:] = (csum[window:] - csum[:-window]) / window
+        smas[window] = sma
+    return smas
+
+def _ema(series, span):
+    """Exponential moving average, NaN until `span` values are available"""
+    return series.ewm(span=span, min_periods=span, adjust=False).mean()
+
+def _rsi(close, window=14):
+    """Wilder's relative strength index"""
+    diff = close.diff()
+    gain = diff.clip(lower=0).fillna(0.0)
+    loss = (-diff).clip(lower=0).fillna(0.0)
+    avg_gain = gain.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    avg_loss = loss.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    return rsi.mask(avg_loss == 0, 100.0)
+
 def add_technical_indicators(df):
     """Add technical indicators to the dataframe"""
     if df.empty:
         return df
         
     try:
+        close = df['close']
+        
         # Add Moving Averages
-        df['SMA_20'] = ta.trend.sma_indicator(df['close'], window=20)
-        df['SMA_50'] = ta.trend.sma_indicator(df['close'], window=50)
+        smas = _smas(close.to_numpy(), (20, 50))
+        df['SMA_20'] = smas[20]
+        df['SMA_50'] = smas[50]
         
         # Add RSI
-        df['RSI'] = ta.momentum.rsi(df['close'], window=14)
+        df['RSI'] = _rsi(close, window=14)
         
         # Add MACD
-        macd = ta.trend.MACD(df['close'])
-        df['MACD'] = macd.macd()
-        df['MACD_Signal'] = macd.macd_signal()
+        df['MACD'] = _ema(close, 12) - _ema(close, 26)
+        df['MACD_Signal'] = _ema(df['MACD'], 9)
+        
+        # Store indicators at the same precision as the price columns
+        columns = ['SMA_20', 'SMA_50', 'RSI', 'MACD', 'MACD_Signal']
+        df[columns] = df[columns].astype('float32')
         
         return df
     except Exception as e:
@@ -80,29 +145,29 @@ def create_plot(df, ticker):
                       row=1, col=1)
 
         # Add SMA lines
-        fig.add_trace(go.Scatter(x=df.index, y=df['SMA_20'],
-                                name='SMA 20',
-                                line=dict(color='orange')),
+        fig.add_trace(go.Scattergl(x=df.index, y=df['SMA_20'],
+                                  name='SMA 20',
+                                  line=dict(color='orange')),
                       row=1, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['SMA_50'],
-                                name='SMA 50',
-                                line=dict(color='blue')),
+        fig.add_trace(go.Scattergl(x=df.index, y=df['SMA_50'],
+                                  name='SMA 50',
+                                  line=dict(color='blue')),
                       row=1, col=1)
 
         # Add RSI
-        fig.add_trace(go.Scatter(x=df.index, y=df['RSI'],
-                                name='RSI',
-                                line=dict(color='purple')),
+        fig.add_trace(go.Scattergl(x=df.index, y=df['RSI'],
+                                  name='RSI',
+                                  line=dict(color='purple')),
                       row=2, col=1)
         
         # Add MACD
-        fig.add_trace(go.Scatter(x=df.index, y=df['MACD'],
-                                name='MACD',
-                                line=dict(color='blue')),
+        fig.add_trace(go.Scattergl(x=df.index, y=df['MACD'],
+                                  name='MACD',
+                                  line=dict(color='blue')),
                       row=3, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['MACD_Signal'],
-                                name='Signal Line',
-                                line=dict(color='red')),
+        fig.add_trace(go.Scattergl(x=df.index, y=df['MACD_Signal'],
+                                  name='Signal Line',
+                                  line=dict(color='red')),
                       row=3, col=1)
 
         # Update layout
@@ -116,13 +181,35 @@ def create_plot(df, ticker):
             template='plotly_dark'
         )
 
-        return fig.to_html(full_html=False)
+        # plotly.js is loaded once by the page template rather than inlined per response
+        return fig.to_html(full_html=False, include_plotlyjs=False)
     except Exception as e:
         print(f"Error creating plot: {str(e)}")
         return json.dumps({'data': [], 'layout': {}})
 
+# Split the dataset by ticker and compute indicators once at startup, over
+# each ticker's full history, so requests only have to slice. Tickers are
+# independent and the NumPy/pandas kernels release the GIL, so run them in threads.
+groups = list(df.groupby('Name', sort=False, observed=True))
+with ThreadPoolExecutor() as executor:
+    frames = executor.map(lambda group: add_technical_indicators(group[1].copy()), groups)
+    by_symbol = {name: frame for (name, _), frame in zip(groups, frames)}
+
+@lru_cache(maxsize=64)
+def analyze_stock(ticker, period):
+    """Build the plot and statistics for a ticker (cached, the dataset is static)"""
+    stock_data = get_stock_data(ticker, period)
+    if stock_data.empty:
+        return None, None
+    return create_plot(stock_data, ticker), calculate_statistics(stock_data)
+
 # Get unique stock names for the dropdown
-stock_names = sorted(df['Name'].unique())
+stock_names = sorted(by_symbol)
+
+# Render a small chart at startup so Plotly's lazily imported validators load
+# here instead of stalling the first /analyze request
+if stock_names:
+    create_plot(by_symbol[stock_names[0]].iloc[-5:], stock_names[0])
 
 @app.route('/')
 def index():
@@ -137,13 +224,9 @@ def analyze():
     if request.method == 'POST':
         ticker = request.form['ticker']
         period = request.form['period']
-        stock_data = df[df['Name'] == ticker].copy()
-        if stock_data.empty:
+        plot_div, stats = analyze_stock(ticker, period)
+        if plot_div is None:
             flash('No data found for the selected stock')
-        else:
-            stock_data = add_technical_indicators(stock_data)
-            plot_div = create_plot(stock_data, ticker)
-            stats = calculate_statistics(stock_data)
     return render_template('index.html', stock_names=stock_names, plot_div=plot_div, stats=stats, ticker=ticker, period=period)
 
 @app.route('/future', methods=['GET', 'POST'])
@@ -152,22 +235,23 @@ def future_prediction():
         ticker = request.form['ticker']
         days = int(request.form['days'])
         # Placeholder: generate random future prices
-        last_price = df[df['Name'] == ticker]['close'].iloc[-1]
-        np.random.seed(42)
-        future_prices = [last_price + np.random.randn() for _ in range(days)]
+        last_price = by_symbol[ticker]['close'].to_numpy()[-1]
+        rng = np.random.RandomState(42)
+        future_prices = (last_price + rng.standard_normal(days)).tolist()
         dates = pd.date_range(start=pd.Timestamp.today(), periods=days)
         prediction = list(zip(dates.strftime('%Y-%m-%d'), future_prices))
         return render_template('future.html', stock_names=stock_names, prediction=prediction, ticker=ticker, days=days)
     return render_template('future.html', stock_names=stock_names)
 
 def calculate_statistics(df):
+    close = df['close'].to_numpy()
     return {
-        'Current Price': f"${df['close'].iloc[-1]:.2f}",
-        '52 Week High': f"${df['high'].max():.2f}",
-        '52 Week Low': f"${df['low'].min():.2f}",
-        'Average Volume': f"{df['volume'].mean():,.0f}",
-        'RSI': f"{df['RSI'].iloc[-1]:.2f}",
-        'MACD': f"{df['MACD'].iloc[-1]:.2f}"
+        'Current Price': f"${close[-1]:.2f}",
+        '52 Week High': f"${df['high'].to_numpy().max():.2f}",
+        '52 Week Low': f"${df['low'].to_numpy().min():.2f}",
+        'Average Volume': f"{df['volume'].to_numpy().mean():,.0f}",
+        'RSI': f"{df['RSI'].to_numpy()[-1]:.2f}",
+        'MACD': f"{df['MACD'].to_numpy()[-1]:.2f}"
     }
 
 if __name__ == '__main__':